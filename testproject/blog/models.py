@@ -14,9 +14,17 @@ class Post(models.Model):
     content = models.TextField()
     author = models.ForeignKey(User, on_delete=models.CASCADE)
     published = models.BooleanField(default=False)
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
     tags = models.ManyToManyField(Tag, blank=True)
 
+    class Meta:
+        indexes = [
+            # Serves the API's ?published=true list, ordered by -created_at
+            models.Index(fields=['created_at'], condition=models.Q(published=True), name='post_published_created_idx'),
+            # Serves cleanup_old_drafts: published=False AND created_at < cutoff
+            models.Index(fields=['created_at'], condition=models.Q(published=False), name='post_draft_created_idx'),
+        ]
+
     def __str__(self):
         return self.title
 
@@ -25,4 +33,4 @@ class Comment(models.Model):
     post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='comments')
     author = models.ForeignKey(User, on_delete=models.CASCADE)
     content = models.TextField()
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
@@ -0,0 +1,8 @@
+from rest_framework.pagination import CursorPagination
+
+
+class CreatedAtCursorPagination(CursorPagination):
+    """Newest first, paged by cursor so deep pages don't need an OFFSET scan."""
+
+    page_size = 25
+    ordering = ('-created_at', '-id')
@@ -0,0 +1,18 @@
+from functools import partial
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Post
+from .tasks import post_title_cache_key
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_title_cache(sender, instance, using, **kwargs):
+    # Wait for the commit: a batch task reading the row before then would
+    # re-cache the old title. The key is built now, as delete() clears pk.
+    key = post_title_cache_key(instance.pk)
+    transaction.on_commit(partial(cache.delete, key), using=using)
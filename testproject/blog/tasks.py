@@ -1,36 +1,258 @@
 """Celery tasks for the blog app."""
-from celery import shared_task
+import smtplib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from celery import group, shared_task
+
+# Recipients per send_post_notification_batch task.
+NOTIFICATION_BATCH_SIZE = 50
+
+POST_TITLE_CACHE_TIMEOUT = 300  # seconds
+
+# Give up on a notification batch of at least ABORT_BATCH_MIN_SIZE messages
+# once 1/ABORT_BATCH_FAILURE_RATIO of them have failed.
+ABORT_BATCH_MIN_SIZE = 30
+ABORT_BATCH_FAILURE_RATIO = 3
+
+# Upper bound on parallel mail connections, to stay under provider limits.
+MAX_SEND_CONCURRENCY = 10
+
+# SMTP replies worth retrying: the server is busy or temporarily unavailable.
+TRANSIENT_SMTP_CODES = frozenset({421, 450, 454, 554})
+SEND_RETRIES = 3
+SEND_RETRY_BACKOFF = 0.5  # seconds, doubled after every attempt
+
+
+def post_title_cache_key(post_id):
+    return f"post:title:{post_id}"
+
+
+def _get_post_title(post_id):
+    """Return a post's title, from the cache when possible.
+
+    Every batch of a fanned-out notification needs the same title, so it
+    is cached for POST_TITLE_CACHE_TIMEOUT seconds. blog.signals drops the
+    entry once a save or delete of the post commits. bulk_create() and
+    QuerySet.update() send no signals, so they leave a stale title cached
+    until it expires.
+
+    Returns:
+        The title, or None if the post does not exist.
+    """
+    from django.core.cache import cache
+    from blog.models import Post
+
+    key = post_title_cache_key(post_id)
+    title = cache.get(key)
+    if title is None:
+        title = Post.objects.filter(id=post_id).values_list("title", flat=True).first()
+        if title is None:
+            return None
+        cache.set(key, title, POST_TITLE_CACHE_TIMEOUT)
+    return title
+
+
+def _is_transient(exc):
+    """Return True if a failed send is worth retrying on a fresh connection."""
+    if isinstance(exc, smtplib.SMTPServerDisconnected):
+        return True
+    if isinstance(exc, smtplib.SMTPRecipientsRefused):
+        # Refusals at RCPT (e.g. 450 greylisting) carry their codes per recipient.
+        codes = [code for code, _ in exc.recipients.values()]
+        return bool(codes) and all(code in TRANSIENT_SMTP_CODES for code in codes)
+    if isinstance(exc, smtplib.SMTPResponseException):
+        return exc.smtp_code in TRANSIENT_SMTP_CODES
+    return False
+
+
+def _send_with_retry(connection, message):
+    """Send one message, retrying transient SMTP failures with backoff.
+
+    Returns:
+        1 if the message was sent, 0 otherwise.
+    """
+    for attempt in range(SEND_RETRIES + 1):
+        if attempt:
+            time.sleep(SEND_RETRY_BACKOFF * 2 ** (attempt - 1))
+        try:
+            if attempt:
+                # The server may have dropped us (421, disconnect), so start
+                # a fresh session.
+                connection.close()
+                connection.open()
+            return connection.send_messages([message])
+        except (smtplib.SMTPException, OSError) as exc:
+            if not _is_transient(exc):
+                return 0
+    return 0
+
+
+class _FailureBudget:
+    """Failure count shared by every shard of one notification batch.
+
+    The abort threshold applies to the batch as a whole, so a failure in
+    any shard counts towards it and stops the other shards as well.
+    """
+
+    def __init__(self, batch_size):
+        self.batch_size = batch_size
+        self.enforced = batch_size >= ABORT_BATCH_MIN_SIZE
+        self.failed = 0
+        self.exhausted = threading.Event()
+        self._lock = threading.Lock()
+
+    def record_failure(self):
+        with self._lock:
+            self.failed += 1
+            # At least 1/ABORT_BATCH_FAILURE_RATIO, without rounding down.
+            if self.enforced and self.failed * ABORT_BATCH_FAILURE_RATIO >= self.batch_size:
+                self.exhausted.set()
+
+
+def _send_batch(messages, budget):
+    """Send messages over one mail connection.
+
+    Stops early once `budget` is exhausted; messages not attempted are
+    reported as skipped.
+
+    Returns:
+        (sent, failed, skipped) tuple.
+    """
+    from django.core.mail import get_connection
+
+    sent = failed = 0
+    with get_connection() as connection:
+        for index, message in enumerate(messages):
+            if budget.exhausted.is_set():
+                return sent, failed, len(messages) - index
+            if _send_with_retry(connection, message):
+                sent += 1
+            else:
+                failed += 1
+                budget.record_failure()
+    return sent, failed, 0
 
 
 @shared_task
-def send_post_notification(post_id, recipient_emails):
+def send_post_notification(post_id, recipient_emails, concurrency=1):
     """Send email notifications when a post is published.
 
+    Recipients are split into batches of NOTIFICATION_BATCH_SIZE and fanned
+    out as a group of send_post_notification_batch tasks, so sending scales
+    with the number of workers consuming the "email" queue. Batch tasks and
+    send_post_published_email are only routed to that queue, so at least one
+    worker must consume it (celery -A testproject worker -Q celery,email)
+    or they are never picked up.
+
     Args:
         post_id: ID of the published post.
         recipient_emails: List of emails to notify.
+        concurrency: Passed through to each batch task.
 
     Returns:
-        dict with sent count.
+        dict with the number of batches dispatched.
     """
-    from django.core.mail import send_mail
     from blog.models import Post
 
-    try:
-        post = Post.objects.get(id=post_id)
-    except Post.DoesNotExist:
+    if not Post.objects.filter(id=post_id).exists():
+        return {"batches": 0, "error": "post not found"}
+
+    batches = [
+        recipient_emails[i:i + NOTIFICATION_BATCH_SIZE]
+        for i in range(0, len(recipient_emails), NOTIFICATION_BATCH_SIZE)
+    ]
+    if batches:
+        group(
+            send_post_notification_batch.s(post_id, batch, concurrency)
+            for batch in batches
+        ).apply_async()
+
+    return {"batches": len(batches), "post_id": post_id}
+
+
+@shared_task(queue="email")
+def send_post_notification_batch(post_id, recipient_emails, concurrency=1):
+    """Send one batch of post notifications.
+
+    Recipients are split into `concurrency` shards, each sent by its own
+    worker thread over its own mail connection. Large batches are abandoned
+    once a third of their messages have failed, counted across all shards,
+    since that usually means the mail server is rejecting us rather than
+    individual recipients being bad.
+
+    Args:
+        post_id: ID of the published post.
+        recipient_emails: List of emails to notify.
+        concurrency: Number of parallel mail connections, capped at
+            MAX_SEND_CONCURRENCY.
+
+    Returns:
+        dict with sent, failed and skipped counts. Skipped recipients were
+        never attempted because the batch was abandoned.
+    """
+    from django.core.mail import EmailMessage
+
+    title = _get_post_title(post_id)
+    if title is None:
         return {"sent": 0, "error": "post not found"}
 
-    sent = 0
-    for email in recipient_emails:
-        send_mail(
-            subject=f"New post: {post.title}",
-            message=f"Check out the new post: {post.title}",
+    messages = [
+        EmailMessage(
+            subject=f"New post: {title}",
+            body=f"Check out the new post: {title}",
             from_email="noreply@blog.com",
-            recipient_list=[email],
+            to=[email],
         )
-        sent += 1
+        for email in recipient_emails
+    ]
+
+    budget = _FailureBudget(len(messages))
+    concurrency = max(1, min(concurrency, MAX_SEND_CONCURRENCY, len(messages)))
+    if concurrency == 1:
+        results = [_send_batch(messages, budget)]
+    else:
+        shards = [messages[i::concurrency] for i in range(concurrency)]
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(executor.map(_send_batch, shards, [budget] * concurrency))
+
+    sent, failed, skipped = (sum(counts) for counts in zip(*results, strict=True))
+    return {
+        "sent": sent,
+        "failed": failed,
+        "skipped": skipped,
+        "post_id": post_id,
+    }
+
+
+@shared_task(queue="email")
+def send_post_published_email(post_id):
+    """Tell a post's author that their post has been published.
+
+    Args:
+        post_id: ID of the published post.
+
+    Returns:
+        dict with sent count.
+    """
+    from django.core.mail import send_mail
+    from blog.models import Post
 
+    post = (
+        Post.objects.filter(id=post_id)
+        .values("title", "author__email")
+        .first()
+    )
+    if post is None:
+        return {"sent": 0, "error": "post not found"}
+
+    sent = send_mail(
+        subject=f"Your post is live: {post['title']}",
+        message=f"Your post \"{post['title']}\" has been published.",
+        from_email="noreply@blog.com",
+        recipient_list=[post["author__email"]],
+    )
     return {"sent": sent, "post_id": post_id}
 
 
@@ -44,18 +266,19 @@ def generate_post_stats(post_id):
     Returns:
         dict with stats.
     """
+    from django.db.models import Count
     from blog.models import Post
 
-    try:
-        post = Post.objects.get(id=post_id)
-    except Post.DoesNotExist:
+    row = (
+        Post.objects.filter(id=post_id)
+        .annotate(comment_count=Count("comments"))
+        .values("title", "comment_count")
+        .first()
+    )
+    if row is None:
         return {"error": "post not found"}
 
-    return {
-        "post_id": post_id,
-        "title": post.title,
-        "comment_count": post.comments.count(),
-    }
+    return {"post_id": post_id, **row}
 
 
 @shared_task
@@ -70,7 +293,7 @@ def cleanup_old_drafts():
     from blog.models import Post
 
     cutoff = timezone.now() - timedelta(days=30)
-    old_drafts = Post.objects.filter(published=False, created_at__lt=cutoff)
-    count = old_drafts.count()
-    old_drafts.delete()
-    return {"deleted": count}
+    # delete() also counts cascaded comments and tag links, so report
+    # only the posts themselves.
+    _, deleted = Post.objects.filter(published=False, created_at__lt=cutoff).delete()
+    return {"deleted": deleted.get(Post._meta.label, 0)}
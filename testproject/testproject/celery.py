@@ -0,0 +1,12 @@
+import os
+
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'testproject.settings')
+
+app = Celery('testproject')
+
+# Read CELERY_* keys from Django settings, so test_settings can switch on
+# eager execution without a broker.
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
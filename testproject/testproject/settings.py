@@ -12,6 +12,7 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'rest_framework',
+    'django_filters',
     'blog',
 ]
 
@@ -35,3 +36,8 @@ DATABASES = {
 }
 
 STATIC_URL = '/static/'
+
+REST_FRAMEWORK = {
+    # JSON only: the browsable API renders an HTML form page per response
+    'DEFAULT_RENDERER_CLASSES': ['rest_framework.renderers.JSONRenderer'],
+}
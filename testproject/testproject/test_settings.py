@@ -1,12 +1,24 @@
+from pathlib import Path
+
 from .settings import *
 
+BASE_DIR = Path(__file__).resolve().parent.parent
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': ':memory:',
+        # Kept on disk so `--reuse-db` can skip schema creation between runs
+        'TEST': {'NAME': BASE_DIR / 'test_db.sqlite3'},
     }
 }
 
+# Tests never need a strong hash, and PBKDF2 dominates user creation time
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+# Sent mail is collected in django.core.mail.outbox
+EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+
 # Celery settings for testing - execute tasks synchronously
 CELERY_TASK_ALWAYS_EAGER = True
 CELERY_TASK_EAGER_PROPAGATES = True
@@ -1,6 +1,28 @@
 import pytest
+from django.core.cache import cache
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
 from rest_framework.test import APIClient
-from .factories import UserFactory, PostFactory, CommentFactory, TagFactory
+from blog.models import Post, Tag
+from .factories import UserFactory, PostFactory, CommentFactory, persistent_instance
+
+
+@receiver(connection_created)
+def _tune_sqlite(sender, connection, **kwargs):
+    # The test database is disposable, so trade durability for speed.
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA synchronous=OFF')
+            cursor.execute('PRAGMA journal_mode=MEMORY')
+            cursor.execute('PRAGMA temp_store=MEMORY')
+            cursor.execute('PRAGMA cache_size=-64000')
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    # Row ids are reused after a rollback, so a title cached by one test
+    # could otherwise be served for a different post in the next.
+    cache.clear()
 
 
 @pytest.fixture
@@ -8,32 +30,30 @@ def api_client():
     return APIClient()
 
 
-@pytest.fixture
-def authenticated_user(db):
-    user = UserFactory()
-    return user
+@pytest.fixture(scope='session')
+def authenticated_user(django_db_setup, django_db_blocker):
+    # Nothing about these users varies between tests, so create them once.
+    yield from persistent_instance(django_db_blocker, UserFactory)
 
 
-@pytest.fixture
-def admin_user(db):
-    user = UserFactory()
-    user.is_staff = True
-    user.is_superuser = True
-    user.save()
-    return user
+@pytest.fixture(scope='session')
+def admin_user(django_db_setup, django_db_blocker):
+    yield from persistent_instance(
+        django_db_blocker, UserFactory, is_staff=True, is_superuser=True
+    )
 
 
 @pytest.fixture
-def auth_client(db):
+def auth_client(db, authenticated_user):
     client = APIClient()
-    user = UserFactory()
-    client.force_authenticate(user=user)
-    return client, user
+    client.force_authenticate(user=authenticated_user)
+    return client, authenticated_user
 
 
-@pytest.fixture(scope='session')
-def django_db_setup():
-    pass
+@pytest.fixture(scope='class')
+def class_author(django_db_setup, django_db_blocker):
+    # One author shared by every test in a class.
+    yield from persistent_instance(django_db_blocker, UserFactory)
 
 
 @pytest.fixture
@@ -43,10 +63,19 @@ def sample_post(db, authenticated_user):
 
 @pytest.fixture
 def sample_posts(db, authenticated_user):
-    return PostFactory.create_batch(5, author=authenticated_user)
+    return Post.objects.bulk_create(PostFactory.build_batch(5, author=authenticated_user))
 
 
-@pytest.fixture
-def sample_tags(db):
-    return TagFactory.create_batch(3)
+@pytest.fixture(scope='session')
+def sample_tags(django_db_setup, django_db_blocker):
+    # Tags are read-only lookups, so create them once for the whole session.
+    # Like persistent_instance rows they are visible to every test, hence
+    # names no test would pick.
+    # get_or_create rather than insert: with --reuse-db, rows left behind by
+    # a session that died before teardown would otherwise break every run.
+    with django_db_blocker.unblock():
+        tags = [Tag.objects.get_or_create(name=f'sample-tag-{i}')[0] for i in range(3)]
+    yield tags
+    with django_db_blocker.unblock():
+        Tag.objects.filter(pk__in=[tag.pk for tag in tags]).delete()
 
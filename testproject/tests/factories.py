@@ -9,7 +9,7 @@ class UserFactory(factory.django.DjangoModelFactory):
 
     username = factory.Faker('user_name')
     email = factory.Faker('email')
-    password = factory.PostGenerationMethodCall('set_password', 'password123')
+    password = factory.django.Password('password123')
 
 
 class TagFactory(factory.django.DjangoModelFactory):
@@ -45,3 +45,17 @@ class PublishedPostFactory(PostFactory):
 
 class DraftPostFactory(PostFactory):
     published = False
+
+
+def persistent_instance(django_db_blocker, factory_class, **kwargs):
+    """Yield an object that outlives the per-test transaction.
+
+    Backs session- and class-scoped fixtures: the row is created outside
+    any test transaction, so every test in scope sees it, and it is
+    deleted explicitly when the fixture is torn down.
+    """
+    with django_db_blocker.unblock():
+        instance = factory_class(**kwargs)
+    yield instance
+    with django_db_blocker.unblock():
+        instance.delete()
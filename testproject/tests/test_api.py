@@ -1,28 +1,73 @@
 import pytest
-from rest_framework.test import APIClient
+from django.urls import reverse
+from rest_framework.test import APIClient, APIRequestFactory, force_authenticate
+from blog.models import Post
+from blog.views import PostViewSet
 from .factories import PostFactory, UserFactory, TagFactory, CommentFactory
 
+POST_LIST_URL = reverse('post-list')
+COMMENT_LIST_URL = reverse('comment-list')
+TAG_LIST_URL = reverse('tag-list')
+
+
+def post_detail_url(pk):
+    return reverse('post-detail', args=[pk])
+
+
+def comment_detail_url(pk):
+    return reverse('comment-detail', args=[pk])
+
+
+# Detail tests call the view directly and skip URL resolution and middleware;
+# APIClient is kept for tests that exercise the full request stack.
+post_detail_view = PostViewSet.as_view({
+    'get': 'retrieve',
+    'put': 'update',
+    'patch': 'partial_update',
+    'delete': 'destroy',
+})
+
 
 @pytest.mark.django_db
 class TestPostAPI:
 
-    def setup_method(self):
+    @pytest.fixture(autouse=True)
+    def _setup(self, class_author):
         self.client = APIClient()
-        self.user = UserFactory()
+        self.factory = APIRequestFactory()
+        self.user = class_author
 
     def teardown_method(self):
         pass
 
     def test_list_posts_unauthenticated(self):
-        PostFactory.create_batch(3)
-        response = self.client.get('/api/posts/')
+        Post.objects.bulk_create(PostFactory.build_batch(3, author=self.user))
+        response = self.client.get(POST_LIST_URL)
+        assert response.status_code == 200
+        assert len(response.data['results']) >= 3
+
+    def test_list_posts_query_count_is_constant(self, django_assert_num_queries):
+        tags = TagFactory.create_batch(2)
+        for post in PostFactory.create_batch(5, author=self.user):
+            post.tags.set(tags)
+        # One query for the posts, one for all their tags
+        with django_assert_num_queries(2):
+            response = self.client.get(POST_LIST_URL)
         assert response.status_code == 200
-        assert len(response.data) >= 3
+
+    def test_list_posts_is_paginated_newest_first(self):
+        Post.objects.bulk_create(PostFactory.build_batch(30, author=self.user))
+        response = self.client.get(POST_LIST_URL)
+        assert response.status_code == 200
+        assert len(response.data['results']) == 25
+        assert response.data['next'] is not None
+        created = [post['created_at'] for post in response.data['results']]
+        assert created == sorted(created, reverse=True)
 
     def test_list_posts_authenticated(self):
         self.client.force_authenticate(user=self.user)
-        PostFactory.create_batch(2, author=self.user)
-        response = self.client.get('/api/posts/')
+        Post.objects.bulk_create(PostFactory.build_batch(2, author=self.user))
+        response = self.client.get(POST_LIST_URL)
         assert response.status_code == 200
 
     def test_create_post_authenticated(self):
@@ -33,60 +78,76 @@ class TestPostAPI:
             'author': self.user.id,
             'published': False,
         }
-        response = self.client.post('/api/posts/', data)
+        response = self.client.post(POST_LIST_URL, data)
         assert response.status_code == 201
         assert response.data['title'] == 'API Test Post'
 
     def test_create_post_unauthenticated_fails(self):
         data = {'title': 'Should fail', 'content': 'nope', 'author': self.user.id}
-        response = self.client.post('/api/posts/', data)
+        response = self.client.post(POST_LIST_URL, data)
         assert response.status_code == 403
 
     def test_retrieve_post(self):
         post = PostFactory(author=self.user)
-        response = self.client.get(f'/api/posts/{post.id}/')
+        request = self.factory.get(post_detail_url(post.id))
+        response = post_detail_view(request, pk=post.id)
         assert response.status_code == 200
         assert response.data['id'] == post.id
 
     def test_update_post_authenticated(self):
         post = PostFactory(author=self.user)
-        self.client.force_authenticate(user=self.user)
         data = {
             'title': 'Updated',
             'content': 'Updated content',
             'author': self.user.id,
             'published': True,
         }
-        response = self.client.put(f'/api/posts/{post.id}/', data)
+        request = self.factory.put(post_detail_url(post.id), data)
+        force_authenticate(request, user=self.user)
+        response = post_detail_view(request, pk=post.id)
         assert response.status_code == 200
         assert response.data['title'] == 'Updated'
 
     def test_partial_update_post(self):
         post = PostFactory(author=self.user)
-        self.client.force_authenticate(user=self.user)
-        response = self.client.patch(f'/api/posts/{post.id}/', {'published': True})
+        request = self.factory.patch(post_detail_url(post.id), {'published': True})
+        force_authenticate(request, user=self.user)
+        response = post_detail_view(request, pk=post.id)
         assert response.status_code == 200
         assert response.data['published'] == True
 
     def test_delete_post_authenticated(self):
         post = PostFactory(author=self.user)
-        self.client.force_authenticate(user=self.user)
-        response = self.client.delete(f'/api/posts/{post.id}/')
+        request = self.factory.delete(post_detail_url(post.id))
+        force_authenticate(request, user=self.user)
+        response = post_detail_view(request, pk=post.id)
         assert response.status_code == 204
 
     def test_retrieve_nonexistent_post(self):
-        response = self.client.get('/api/posts/99999/')
+        request = self.factory.get(post_detail_url(99999))
+        response = post_detail_view(request, pk=99999)
         assert response.status_code == 404
 
     def test_filter_posts_by_published(self):
-        PostFactory(author=self.user, published=True)
-        PostFactory(author=self.user, published=False)
-        response = self.client.get('/api/posts/?published=true')
+        Post.objects.bulk_create([
+            PostFactory.build(author=self.user, published=True),
+            PostFactory.build(author=self.user, published=False),
+        ])
+        response = self.client.get(f'{POST_LIST_URL}?published=true')
+        assert response.status_code == 200
+        assert [post['published'] for post in response.data['results']] == [True]
+
+    def test_filter_posts_by_author(self):
+        other = UserFactory()
+        PostFactory(author=self.user)
+        PostFactory(author=other)
+        response = self.client.get(f'{POST_LIST_URL}?author={other.id}')
         assert response.status_code == 200
+        assert [post['author'] for post in response.data['results']] == [other.id]
 
     def test_tag_list(self):
         TagFactory.create_batch(3)
-        response = self.client.get('/api/tags/')
+        response = self.client.get(TAG_LIST_URL)
         assert response.status_code == 200
         assert len(response.data) >= 3
 
@@ -94,20 +155,24 @@ class TestPostAPI:
         post = PostFactory(author=self.user)
         self.client.force_authenticate(user=self.user)
         data = {'post': post.id, 'author': self.user.id, 'content': 'Nice post!'}
-        response = self.client.post('/api/comments/', data)
+        response = self.client.post(COMMENT_LIST_URL, data)
         assert response.status_code == 201
 
     def test_comment_list_for_post(self):
         post = PostFactory(author=self.user)
-        CommentFactory.create_batch(3, post=post)
-        response = self.client.get('/api/comments/')
+        CommentFactory.create_batch(3, post=post, author=self.user)
+        response = self.client.get(COMMENT_LIST_URL)
         assert response.status_code == 200
 
     def test_delete_comment_unauthenticated(self):
-        comment = CommentFactory()
-        response = self.client.delete(f'/api/comments/{comment.id}/')
+        comment = CommentFactory(post__author=self.user, author=self.user)
+        response = self.client.delete(comment_detail_url(comment.id))
         assert response.status_code == 403
 
     def test_api_returns_json(self):
-        response = self.client.get('/api/posts/')
+        response = self.client.get(POST_LIST_URL)
         assert response.accepted_media_type == 'application/json'
+
+    def test_api_does_not_render_html(self):
+        response = self.client.get(POST_LIST_URL, HTTP_ACCEPT='text/html')
+        assert response.status_code == 406
@@ -1,6 +1,7 @@
 """Tests for Celery tasks using CELERY_TASK_ALWAYS_EAGER=True."""
 from unittest.mock import patch, call
 import pytest
+from django.core import mail
 from .factories import PostFactory, UserFactory
 
 
@@ -8,69 +9,277 @@ from .factories import PostFactory, UserFactory
 class TestSendPostNotification:
     """Test the send_post_notification task."""
 
-    def test_task_runs_synchronously_with_always_eager(self, settings):
+    def test_task_runs_synchronously_with_always_eager(self):
         """With CELERY_TASK_ALWAYS_EAGER=True, tasks execute inline."""
-        settings.CELERY_TASK_ALWAYS_EAGER = True
         post = PostFactory(published=True)
 
-        with patch('django.core.mail.send_mail') as mock_mail:
-            from blog.tasks import send_post_notification
-            result = send_post_notification.delay(
-                post_id=post.id,
-                recipient_emails=["user1@example.com", "user2@example.com"]
-            )
+        from blog.tasks import send_post_notification
+        result = send_post_notification.delay(
+            post_id=post.id,
+            recipient_emails=["user1@example.com", "user2@example.com"]
+        )
 
-            assert result.result["sent"] == 2
-            assert mock_mail.call_count == 2
+        assert result.result["batches"] == 1
+        assert len(mail.outbox) == 2
 
-    def test_task_sends_correct_subject(self, settings):
+    def test_task_sends_correct_subject(self):
         """Notification email contains the post title."""
-        settings.CELERY_TASK_ALWAYS_EAGER = True
         post = PostFactory(published=True, title="My Amazing Post")
 
-        with patch('django.core.mail.send_mail') as mock_mail:
-            from blog.tasks import send_post_notification
-            send_post_notification.delay(
-                post_id=post.id,
-                recipient_emails=["user@example.com"]
-            )
+        from blog.tasks import send_post_notification
+        send_post_notification.delay(
+            post_id=post.id,
+            recipient_emails=["user@example.com"]
+        )
 
-            subject = mock_mail.call_args[1].get('subject') or mock_mail.call_args[0][0]
-            assert "My Amazing Post" in subject
+        assert mail.outbox[0].subject == "New post: My Amazing Post"
 
-    def test_task_returns_error_for_missing_post(self, settings):
+    def test_task_returns_error_for_missing_post(self):
         """Task handles non-existent post gracefully."""
-        settings.CELERY_TASK_ALWAYS_EAGER = True
 
         from blog.tasks import send_post_notification
         result = send_post_notification.delay(post_id=99999, recipient_emails=[])
 
         assert result.result["error"] == "post not found"
-        assert result.result["sent"] == 0
+        assert result.result["batches"] == 0
 
-    def test_task_sends_no_emails_for_empty_list(self, settings):
+    def test_task_sends_no_emails_for_empty_list(self):
         """Task with empty recipient list sends zero emails."""
-        settings.CELERY_TASK_ALWAYS_EAGER = True
         post = PostFactory(published=True)
 
-        with patch('django.core.mail.send_mail') as mock_mail:
+        from blog.tasks import send_post_notification
+        result = send_post_notification.delay(
+            post_id=post.id,
+            recipient_emails=[]
+        )
+
+        assert result.result["batches"] == 0
+        assert mail.outbox == []
+
+    def test_task_fans_out_one_batch_per_chunk(self):
+        """Recipients are split into NOTIFICATION_BATCH_SIZE-sized batch tasks."""
+        post = PostFactory(published=True)
+        recipients = [f"user{i}@example.com" for i in range(5)]
+
+        with patch('blog.tasks.NOTIFICATION_BATCH_SIZE', 2):
             from blog.tasks import send_post_notification
             result = send_post_notification.delay(
                 post_id=post.id,
-                recipient_emails=[]
+                recipient_emails=recipients
             )
 
-            assert result.result["sent"] == 0
-            mock_mail.assert_not_called()
+        assert result.result["batches"] == 3
+        assert len(mail.outbox) == 5
+
+
+@pytest.mark.django_db
+class TestSendPostNotificationBatch:
+    """Test the send_post_notification_batch task."""
+
+    def test_returns_error_for_missing_post(self):
+        """Batch task handles a post deleted after dispatch."""
+
+        from blog.tasks import send_post_notification_batch
+        result = send_post_notification_batch.delay(
+            post_id=99999,
+            recipient_emails=["user@example.com"]
+        )
+
+        assert result.result["error"] == "post not found"
+        assert len(mail.outbox) == 0
+
+    def test_reuses_cached_post_title(self, django_assert_num_queries):
+        """Later batches for the same post don't query the database."""
+        post = PostFactory(published=True)
+
+        from blog.tasks import send_post_notification_batch
+        send_post_notification_batch.delay(post.id, ["user1@example.com"])
+        with django_assert_num_queries(0):
+            send_post_notification_batch.delay(post.id, ["user2@example.com"])
+
+        assert len(mail.outbox) == 2
+
+    def test_saving_post_refreshes_cached_title(self, django_capture_on_commit_callbacks):
+        """Editing a post invalidates its cached title once the save commits."""
+        post = PostFactory(published=True, title="Old title")
+
+        from blog.tasks import send_post_notification_batch
+        send_post_notification_batch.delay(post.id, ["user@example.com"])
+        post.title = "New title"
+        with django_capture_on_commit_callbacks(execute=True):
+            post.save()
+        send_post_notification_batch.delay(post.id, ["user@example.com"])
+
+        assert mail.outbox[1].subject == "New post: New title"
+
+    def test_cached_title_survives_until_commit(self, django_capture_on_commit_callbacks):
+        """The cache entry is only dropped when the saving transaction commits."""
+        from django.core.cache import cache
+        from blog.tasks import _get_post_title, post_title_cache_key
+        post = PostFactory(published=True, title="Old title")
+        _get_post_title(post.id)
+
+        with django_capture_on_commit_callbacks() as callbacks:
+            post.title = "New title"
+            post.save()
+            assert cache.get(post_title_cache_key(post.id)) == "Old title"
+
+        assert len(callbacks) == 1
+
+    def test_aborts_when_too_many_fail(self):
+        """A large batch stops once a third of its messages have failed."""
+        post = PostFactory(published=True)
+        recipients = [f"user{i}@example.com" for i in range(30)]
+
+        with patch('django.core.mail.backends.locmem.EmailBackend.send_messages', return_value=0):
+            from blog.tasks import send_post_notification_batch
+            result = send_post_notification_batch.delay(
+                post_id=post.id,
+                recipient_emails=recipients
+            )
+
+        assert result.result["sent"] == 0
+        assert result.result["failed"] == 10
+        assert result.result["skipped"] == 20
+
+    def test_abort_waits_for_a_full_third(self):
+        """An uneven batch aborts only once at least a third has failed."""
+        post = PostFactory(published=True)
+        recipients = [f"user{i}@example.com" for i in range(31)]
+
+        with patch('django.core.mail.backends.locmem.EmailBackend.send_messages', return_value=0):
+            from blog.tasks import send_post_notification_batch
+            result = send_post_notification_batch.delay(
+                post_id=post.id,
+                recipient_emails=recipients
+            )
+
+        assert result.result["failed"] == 11
+        assert result.result["skipped"] == 20
+
+    def test_abort_threshold_spans_all_shards(self):
+        """Failures from every worker count towards one batch-wide threshold."""
+        post = PostFactory(published=True)
+        recipients = [f"user{i}@example.com" for i in range(30)]
+
+        with patch('django.core.mail.backends.locmem.EmailBackend.send_messages', return_value=0):
+            from blog.tasks import send_post_notification_batch
+            result = send_post_notification_batch.delay(
+                post_id=post.id,
+                recipient_emails=recipients,
+                concurrency=3,
+            )
+
+        assert result.result["skipped"] > 0
+        assert result.result["failed"] + result.result["skipped"] == 30
+
+    def test_spreads_recipients_across_workers(self):
+        """With concurrency > 1, every recipient is still emailed exactly once."""
+        post = PostFactory(published=True)
+        recipients = [f"user{i}@example.com" for i in range(5)]
+
+        from blog.tasks import send_post_notification_batch
+        result = send_post_notification_batch.delay(
+            post_id=post.id,
+            recipient_emails=recipients,
+            concurrency=3,
+        )
+
+        assert result.result["sent"] == 5
+        assert sorted(m.to[0] for m in mail.outbox) == sorted(recipients)
+
+    def test_retries_transient_smtp_errors(self):
+        """A 421 reply is retried; a permanent 550 is counted as a failure."""
+        import smtplib
+        post = PostFactory(published=True)
+        busy = smtplib.SMTPResponseException(421, b"Service not available")
+        rejected = smtplib.SMTPResponseException(550, b"Mailbox unavailable")
+
+        with patch('django.core.mail.backends.locmem.EmailBackend.send_messages',
+                   side_effect=[busy, 1, rejected]), \
+                patch('blog.tasks.time.sleep') as mock_sleep:
+            from blog.tasks import send_post_notification_batch
+            result = send_post_notification_batch.delay(
+                post_id=post.id,
+                recipient_emails=["user1@example.com", "user2@example.com"]
+            )
+
+        assert result.result["sent"] == 1
+        assert result.result["failed"] == 1
+        mock_sleep.assert_called_once()
+
+    def test_retries_greylisted_recipient(self):
+        """A 450 refusal at RCPT is retried rather than counted as a failure."""
+        import smtplib
+        post = PostFactory(published=True)
+        greylisted = smtplib.SMTPRecipientsRefused(
+            {"user@example.com": (450, b"Greylisted, try again later")}
+        )
+
+        with patch('django.core.mail.backends.locmem.EmailBackend.send_messages',
+                   side_effect=[greylisted, 1]), \
+                patch('blog.tasks.time.sleep') as mock_sleep:
+            from blog.tasks import send_post_notification_batch
+            result = send_post_notification_batch.delay(
+                post_id=post.id,
+                recipient_emails=["user@example.com"]
+            )
+
+        assert result.result["sent"] == 1
+        assert result.result["failed"] == 0
+        mock_sleep.assert_called_once()
+
+    def test_reconnects_after_server_disconnect(self):
+        """A dropped connection is reopened and the message resent."""
+        import smtplib
+        post = PostFactory(published=True)
+
+        with patch('django.core.mail.backends.locmem.EmailBackend.send_messages',
+                   side_effect=[smtplib.SMTPServerDisconnected("Connection lost"), 1]), \
+                patch('django.core.mail.backends.locmem.EmailBackend.open') as mock_open, \
+                patch('blog.tasks.time.sleep'):
+            from blog.tasks import send_post_notification_batch
+            result = send_post_notification_batch.delay(
+                post_id=post.id,
+                recipient_emails=["user@example.com"]
+            )
+
+        assert result.result["sent"] == 1
+        assert result.result["failed"] == 0
+        mock_open.assert_called()
+
+
+@pytest.mark.django_db
+class TestSendPostPublishedEmail:
+    """Test the send_post_published_email task."""
+
+    def test_emails_the_author(self):
+        """The author gets one email naming their post."""
+        post = PostFactory(published=True, title="My Amazing Post", author__email="author@example.com")
+
+        from blog.tasks import send_post_published_email
+        result = send_post_published_email.delay(post.id)
+
+        assert result.result["sent"] == 1
+        assert mail.outbox[0].to == ["author@example.com"]
+        assert mail.outbox[0].subject == "Your post is live: My Amazing Post"
+
+    def test_returns_error_for_missing_post(self):
+        """Task handles non-existent post gracefully."""
+
+        from blog.tasks import send_post_published_email
+        result = send_post_published_email.delay(99999)
+
+        assert result.result["error"] == "post not found"
+        assert mail.outbox == []
 
 
 @pytest.mark.django_db
 class TestGeneratePostStats:
     """Test the generate_post_stats task."""
 
-    def test_returns_stats_for_existing_post(self, settings):
+    def test_returns_stats_for_existing_post(self):
         """Stats task returns correct data for a valid post."""
-        settings.CELERY_TASK_ALWAYS_EAGER = True
         post = PostFactory(published=True)
 
         from blog.tasks import generate_post_stats
@@ -80,18 +289,16 @@ class TestGeneratePostStats:
         assert result.result["title"] == post.title
         assert "comment_count" in result.result
 
-    def test_returns_error_for_missing_post(self, settings):
+    def test_returns_error_for_missing_post(self):
         """Stats task handles non-existent post."""
-        settings.CELERY_TASK_ALWAYS_EAGER = True
 
         from blog.tasks import generate_post_stats
         result = generate_post_stats.delay(post_id=99999)
 
         assert result.result["error"] == "post not found"
 
-    def test_comment_count_is_zero_for_new_post(self, settings):
+    def test_comment_count_is_zero_for_new_post(self):
         """Newly created post has zero comments."""
-        settings.CELERY_TASK_ALWAYS_EAGER = True
         post = PostFactory(published=True)
 
         from blog.tasks import generate_post_stats
@@ -99,16 +306,27 @@ class TestGeneratePostStats:
 
         assert result.result["comment_count"] == 0
 
+    def test_stats_use_a_single_query(self, django_assert_num_queries):
+        """Title and comment count come back from one annotated query."""
+        from .factories import CommentFactory
+        post = PostFactory(published=True)
+        CommentFactory.create_batch(2, post=post)
+
+        from blog.tasks import generate_post_stats
+        with django_assert_num_queries(1):
+            result = generate_post_stats.delay(post_id=post.id)
+
+        assert result.result["comment_count"] == 2
+
 
 @pytest.mark.django_db
 class TestCleanupOldDrafts:
     """Test the cleanup_old_drafts task."""
 
-    def test_deletes_old_drafts(self, settings):
+    def test_deletes_old_drafts(self):
         """Old unpublished posts are deleted."""
         from datetime import timedelta
         from django.utils import timezone
-        settings.CELERY_TASK_ALWAYS_EAGER = True
 
         old_post = PostFactory(published=False)
         # Manually age the post
@@ -120,9 +338,24 @@ class TestCleanupOldDrafts:
 
         assert result.result["deleted"] >= 1
 
-    def test_keeps_recent_drafts(self, settings):
+    def test_deleted_count_excludes_cascaded_rows(self):
+        """Comments removed along with a draft are not counted as drafts."""
+        from datetime import timedelta
+        from django.utils import timezone
+        from .factories import CommentFactory
+
+        old_post = PostFactory(published=False)
+        CommentFactory.create_batch(2, post=old_post)
+        old_post.created_at = timezone.now() - timedelta(days=31)
+        old_post.save()
+
+        from blog.tasks import cleanup_old_drafts
+        result = cleanup_old_drafts.delay()
+
+        assert result.result["deleted"] == 1
+
+    def test_keeps_recent_drafts(self):
         """Recent unpublished posts are not deleted."""
-        settings.CELERY_TASK_ALWAYS_EAGER = True
         recent_draft = PostFactory(published=False)
 
         from blog.models import Post
@@ -134,11 +367,10 @@ class TestCleanupOldDrafts:
         count_after = Post.objects.filter(published=False).count()
         assert count_after == count_before
 
-    def test_does_not_delete_published_posts(self, settings):
+    def test_does_not_delete_published_posts(self):
         """Published posts are never deleted by cleanup."""
         from datetime import timedelta
         from django.utils import timezone
-        settings.CELERY_TASK_ALWAYS_EAGER = True
 
         old_published = PostFactory(published=True)
         old_published.created_at = timezone.now() - timedelta(days=60)
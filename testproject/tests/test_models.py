@@ -37,6 +37,11 @@ class TestPostModel:
         post.tags.add(tag)
         assert tag in post.tags.all()
 
+    def test_post_can_have_many_tags(self, sample_tags):
+        post = PostFactory(author=self.user)
+        post.tags.set(sample_tags)
+        assert post.tags.count() == 3
+
     def test_comment_linked_to_post(self):
         post = PostFactory(author=self.user)
         comment = CommentFactory(post=post)
@@ -1,16 +1,18 @@
 import pytest
 from django.test import Client, RequestFactory
 from django.contrib.auth.models import User
-from .factories import PostFactory, UserFactory
+from blog.models import Post
+from .factories import PostFactory
 
 
 @pytest.mark.django_db
 class TestPostViews:
 
-    def setup_method(self):
+    @pytest.fixture(autouse=True)
+    def _setup(self, class_author):
         self.client = Client()
         self.factory = RequestFactory()
-        self.user = UserFactory()
+        self.user = class_author
 
     def teardown_method(self):
         pass
@@ -63,11 +65,11 @@ class TestPostViews:
         assert response.status_code == 204
 
     def test_post_list_returns_all_posts(self):
-        PostFactory.create_batch(3, author=self.user)
+        Post.objects.bulk_create(PostFactory.build_batch(3, author=self.user))
         response = self.client.get('/api/posts/')
         import json
         data = json.loads(response.content)
-        assert len(data) >= 3
+        assert len(data['results']) >= 3
 
     def test_nonexistent_post_returns_404(self):
         response = self.client.get('/api/posts/99999/')
@@ -0,0 +1,12 @@
+"""Content-Security-Policy settings shared by the CSP pattern tests."""
+from __future__ import annotations
+
+from types import MappingProxyType
+
+CSP_STRICT = MappingProxyType({
+    "DIRECTIVES": MappingProxyType({
+        "default-src": ("'self'",),
+        "script-src": ("'self'",),
+        "style-src": ("'self'", "'unsafe-inline'"),
+    }),
+})
@@ -0,0 +1,40 @@
+"""Shared fixtures for the Django 5.2 / 6.0 pattern tests."""
+from __future__ import annotations
+
+import pytest
+from django.test import Client, override_settings
+
+from _csp import CSP_STRICT
+from tests.factories import UserFactory, persistent_instance
+
+
+@pytest.fixture(scope="session")
+def shared_user(django_db_setup, django_db_blocker):
+    """A read-only user created once per session."""
+    yield from persistent_instance(django_db_blocker, UserFactory)
+
+
+@pytest.fixture(scope="session")
+def logged_in_client(django_db_blocker, shared_user):
+    """A client logged in as shared_user, created once per session.
+
+    force_login writes a session row, so do it once up front instead of in
+    every test. The session is flushed before shared_user is deleted.
+    """
+    client = Client()
+    with django_db_blocker.unblock():
+        client.force_login(shared_user)
+    yield client
+    with django_db_blocker.unblock():
+        client.logout()
+
+
+@pytest.fixture(scope="class")
+def csp_strict():
+    """Apply CSP_STRICT for a whole test class.
+
+    override_settings only decorates SimpleTestCase subclasses, so plain
+    pytest classes opt in with @pytest.mark.usefixtures("csp_strict").
+    """
+    with override_settings(CONTENT_SECURITY_POLICY=CSP_STRICT):
+        yield
@@ -5,59 +5,71 @@ This module shows how to test them — patterns that work today and
 will be used with django.tasks in Django 6.0.
 
 Strategy:
-- In tests: use TASK_ALWAYS_EAGER=True equivalent — run synchronously
+- In tests: patch .delay() to check what gets enqueued
+- Run the task body synchronously with .run() — no eager Celery needed
 - Assert side effects (emails sent, DB changes) not task internals
-- Use django.test.override_settings to control task execution
 """
 from __future__ import annotations
 
-from unittest.mock import MagicMock, call, patch
+import json
+from unittest.mock import Mock, call, patch
 
 import pytest
 from django.core import mail
-from django.test import TestCase, override_settings
+from django.test import TestCase
+from rest_framework.test import APIRequestFactory, force_authenticate
+from syrupy.assertion import SnapshotAssertion
+from syrupy.filters import props
 
-from .factories import PostFactory, UserFactory
+from blog.tasks import send_post_published_email
+from blog.views import PostViewSet
+
+from tests.factories import PostFactory, UserFactory
+
+post_list_view = PostViewSet.as_view({"get": "list"})
 
 
 class TestCeleryTasksAsBackgroundTasks(TestCase):
-    """Current approach: Celery tasks tested with ALWAYS_EAGER.
+    """Current approach: mock the enqueue, run the task body directly.
 
-    In Django 6.0, simple tasks will migrate to native background tasks.
-    The test strategy remains the same: assert outcomes, not mechanics.
+    Patching .delay() checks what gets queued without Celery's eager
+    machinery; .run() executes the task body inline so side effects can be
+    asserted. In Django 6.0, simple tasks will migrate to native background
+    tasks. The test strategy remains the same: assert outcomes, not mechanics.
     """
 
-    @override_settings(CELERY_TASK_ALWAYS_EAGER=True, CELERY_TASK_EAGER_PROPAGATES=True)
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user = UserFactory(email="author@example.com")
+        cls.post = PostFactory(author=cls.user, title="Test Post")
+
     def test_email_task_sends_email(self) -> None:
         """Background email task sends exactly one email to the right recipient."""
-        from blog.tasks import send_post_published_email
-
-        user = UserFactory(email="author@example.com")
-        post = PostFactory(author=user, title="Test Post")
+        with patch("blog.tasks.send_post_published_email.delay", new_callable=Mock) as mock_delay:
+            send_post_published_email.delay(self.post.pk)
+        assert mock_delay.call_args_list == [call(self.post.pk)]
 
-        send_post_published_email.delay(post.pk)
+        send_post_published_email.run(self.post.pk)
 
         assert len(mail.outbox) == 1
         assert mail.outbox[0].to == ["author@example.com"]
 
-    @override_settings(CELERY_TASK_ALWAYS_EAGER=True)
     def test_task_idempotent_on_rerun(self) -> None:
         """Running the same task twice should not duplicate side effects."""
-        from blog.tasks import send_post_published_email
-
-        user = UserFactory()
-        post = PostFactory(author=user)
-
         # Simulate task being enqueued twice (e.g., network retry)
-        send_post_published_email.delay(post.pk)
-        send_post_published_email.delay(post.pk)
+        with patch("blog.tasks.send_post_published_email.delay", new_callable=Mock) as mock_delay:
+            send_post_published_email.delay(self.post.pk)
+            send_post_published_email.delay(self.post.pk)
+        assert mock_delay.call_args_list == [call(self.post.pk)] * 2
+
+        send_post_published_email.run(self.post.pk)
+        send_post_published_email.run(self.post.pk)
 
         # Idempotent: only 1 email should be in outbox if task checks "already sent"
         # In practice, depends on implementation — here we just assert <= 2
         assert len(mail.outbox) <= 2
 
 
-@pytest.mark.django_db
 class TestNativeBackgroundTaskPattern:
     """Django 6.0 native background task testing pattern.
 
@@ -65,52 +77,54 @@ class TestNativeBackgroundTaskPattern:
     Tests look almost identical — assert outcomes, not the queue.
     """
 
-    def test_background_task_outcome(self, settings) -> None:
+    def test_background_task_outcome(self) -> None:
         """Verify the outcome of a background task regardless of execution model."""
         # Django 6.0: task.enqueue(args) → runs after response
-        # In tests: task runs synchronously (TASK_ALWAYS_EAGER equivalent)
-        settings.CELERY_TASK_ALWAYS_EAGER = True
+        # The task is mocked, so no post row or eager Celery is needed
+        post_pk = 42
 
-        user = UserFactory()
-        post = PostFactory(author=user, is_published=False)
-
-        # Simulate background task: mark post as notified
-        with patch("blog.tasks.send_post_published_email") as mock_task:
-            mock_task.delay(post.pk)
-            mock_task.assert_called_once_with(post.pk)
+        with patch("blog.tasks.send_post_published_email", new_callable=Mock) as mock_task:
+            mock_task.delay(post_pk)
+            mock_task.delay.assert_called_once_with(post_pk)
 
     def test_task_failure_handling(self) -> None:
-        """Failed background tasks should not crash the request."""
-        with patch("blog.tasks.send_post_published_email") as mock_task:
-            mock_task.delay.side_effect = Exception("SMTP connection failed")
-
-            # The task failing should not propagate to the view
-            try:
-                mock_task.delay(999)
-            except Exception:
-                pass  # Expected in test — in prod, task framework catches this
-
-        # Application should still be functional
-        assert True  # test passed without crashing
+        """A failing enqueue surfaces its error instead of being swallowed."""
+        with patch(
+            "blog.tasks.send_post_published_email.delay",
+            new_callable=Mock,
+            side_effect=RuntimeError("SMTP connection failed"),
+        ) as mock_delay, pytest.raises(RuntimeError):
+            mock_delay(999)
+        mock_delay.assert_called_once_with(999)
 
 
 class TestSnapshotStyleAssertions(TestCase):
-    """Syrupy-style snapshot testing without the syrupy dependency.
+    """Snapshot testing with syrupy inside a Django TestCase.
 
-    In 2025, syrupy is the standard for snapshot testing in pytest.
-    Here we show the pattern using plain assertions for portability.
+    TestCase methods cannot request pytest fixtures as arguments, so an
+    autouse fixture hands the snapshot to the instance instead.
     """
 
+    factory = APIRequestFactory()
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user = UserFactory()
+        cls.post = PostFactory(author=cls.user, title="Snapshot post", content="Snapshot body")
+
+    @pytest.fixture(autouse=True)
+    def _snapshot(self, snapshot: SnapshotAssertion) -> None:
+        self.snapshot = snapshot
+
     def test_api_response_structure_stable(self) -> None:
         """Assert that API response structure matches expected schema."""
-        user = UserFactory()
-        self.client.force_login(user)
+        # Call the view directly: the shape comes from the serializer, not
+        # from URL routing or middleware.
+        request = self.factory.get("/api/posts/")
+        force_authenticate(request, user=self.user)
 
-        response = self.client.get("/api/posts/")
-        data = response.json()
+        response = post_list_view(request)
+        data = json.loads(response.render().content)
 
-        # Snapshot-style: assert the exact structure
-        if isinstance(data, list):
-            assert all("id" in item for item in data)
-        elif isinstance(data, dict):
-            assert "count" in data or "results" in data or "id" in data
+        # Primary keys, timestamps and the author pk differ between runs
+        assert data == self.snapshot(exclude=props("id", "created_at", "author"))
@@ -1,37 +1,46 @@
 """Django 5.2 LTS testing patterns.
 
 Covers:
-- assertWarns for deprecation warnings
+- Catching deprecation warnings
 - Snapshot testing with syrupy
 - CSP header testing (preparation for Django 6.0)
 """
 from __future__ import annotations
 
+import json
 import warnings
 
 import pytest
-from django.test import RequestFactory, TestCase, override_settings
+from django.test import RequestFactory
+from django.utils.text import slugify
+from rest_framework.test import APIRequestFactory, force_authenticate
+from syrupy.assertion import SnapshotAssertion
+from syrupy.filters import props
 
-from .factories import PostFactory, UserFactory
+from blog.models import Post
+from blog.views import PostViewSet
 
+from tests.factories import PostFactory
 
-class TestDeprecationWarnings(TestCase):
-    """Django 5.2: assertWarns catches DeprecationWarning from old patterns."""
+post_list_view = PostViewSet.as_view({"get": "list"})
 
-    def test_deprecated_pattern_warns(self) -> None:
-        """Verify that using a deprecated API raises DeprecationWarning."""
-        with self.assertWarns(DeprecationWarning):
-            warnings.warn("This pattern is deprecated", DeprecationWarning, stacklevel=2)
+_POST_DETAIL_KEYS = frozenset({"id", "title", "content", "author"})
 
-    def test_no_unexpected_warnings(self) -> None:
-        """Normal code paths should not emit deprecation warnings."""
-        import warnings
 
-        with warnings.catch_warnings():
-            warnings.simplefilter("error", DeprecationWarning)
-            # This should not raise
-            result = 1 + 1
-        assert result == 2
+class TestDeprecationWarnings:
+    """Django 5.2: catch DeprecationWarning from old patterns."""
+
+    @pytest.mark.parametrize("emit,should_warn", [
+        (lambda: warnings.warn("This pattern is deprecated", DeprecationWarning, stacklevel=2), True),
+        (lambda: 1 + 1, False),
+    ], ids=["deprecated", "clean"])
+    def test_deprecation_warning(self, emit, should_warn: bool) -> None:
+        """Deprecated APIs warn; normal code paths stay silent."""
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            emit()
+        deprecations = [w for w in caught if issubclass(w.category, DeprecationWarning)]
+        assert bool(deprecations) == should_warn
 
 
 @pytest.mark.django_db
@@ -42,47 +51,39 @@ class TestSnapshotTesting:
     They fail when the response shape changes unexpectedly.
     """
 
-    def test_post_list_response_shape(self, client, django_user_model):
+    factory = APIRequestFactory()
+
+    def test_post_list_response_shape(self, shared_user, snapshot: SnapshotAssertion):
         """Verify API response shape hasn't changed (snapshot test)."""
-        user = UserFactory()
-        PostFactory.create_batch(3, author=user)
-        client.force_login(user)
+        Post.objects.bulk_create(
+            [Post(author=shared_user, title=f"t{i}", content="x") for i in range(3)]
+        )
+        request = self.factory.get("/api/posts/")
+        force_authenticate(request, user=shared_user)
 
-        response = client.get("/api/posts/")
-        data = response.json()
+        response = post_list_view(request)
+        data = json.loads(response.render().content)
 
-        # Without syrupy installed, we assert the structure manually.
-        # With syrupy: assert data == snapshot
-        assert "count" in data or isinstance(data, list)
-        if isinstance(data, dict):
-            assert "results" in data or "count" in data
+        # Primary keys and timestamps differ between runs; everything else
+        # in the payload is pinned by the snapshot.
+        assert data == snapshot(exclude=props("id", "created_at", "author"))
 
-    def test_post_detail_keys(self, client, django_user_model):
+    def test_post_detail_keys(self, logged_in_client, shared_user):
         """Verify the keys present in a post detail response."""
-        user = UserFactory()
-        post = PostFactory(author=user)
-        client.force_login(user)
+        post = PostFactory(author=shared_user)
 
-        response = client.get(f"/api/posts/{post.pk}/")
+        response = logged_in_client.get(f"/api/posts/{post.pk}/")
 
         if response.status_code == 200:
             data = response.json()
-            expected_keys = {"id", "title", "content", "author"}
-            assert expected_keys.issubset(data.keys())
+            assert _POST_DETAIL_KEYS.issubset(data)
 
 
 @pytest.mark.django_db
+@pytest.mark.usefixtures("csp_strict")
 class TestCSPHeaders:
     """Prepare for Django 6.0 CSP — test security headers in responses."""
 
-    @override_settings(
-        CONTENT_SECURITY_POLICY={
-            "DIRECTIVES": {
-                "default-src": ["'self'"],
-                "script-src": ["'self'"],
-            }
-        }
-    )
     def test_csp_header_present(self, client):
         """When CSP is configured, it should appear in response headers."""
         response = client.get("/api/posts/")
@@ -106,9 +107,4 @@ class TestParametrize:
     ])
     def test_slug_generation(self, title: str, expected_slug: str) -> None:
         """Parametrize is the idiomatic way to test multiple inputs."""
-        from django.utils.text import slugify
-
-        result = slugify(title)
-        # Flexible assertion — slug should contain key words
-        assert result  # not empty
-        assert len(result) > 0
+        assert slugify(title) == expected_slug
@@ -8,29 +8,33 @@ New in Django 6.0:
 """
 from __future__ import annotations
 
-from unittest.mock import patch
+from unittest.mock import Mock, patch
 
+import django
 import pytest
-from django.test import TestCase, override_settings
+from django.core import mail
+from django.test import AsyncClient
 
-from .factories import PostFactory, UserFactory
+from blog.models import Post
+from blog.tasks import send_post_published_email
 
+from _csp import CSP_STRICT
 
-@override_settings(
-    CONTENT_SECURITY_POLICY={
-        "DIRECTIVES": {
-            "default-src": ["'self'"],
-            "script-src": ["'self'"],
-            "style-src": ["'self'", "'unsafe-inline'"],
-        }
-    }
-)
-class TestDjango60CSP(TestCase):
+DJANGO_60 = django.VERSION[:2] >= (6, 0)
+
+
+@pytest.mark.usefixtures("csp_strict")
+class TestDjango60CSP:
     """Django 6.0: Content-Security-Policy is now a first-class Django feature.
 
     No more django-csp package needed. Test CSP headers directly.
     """
 
+    @pytest.fixture(autouse=True)
+    def _client(self, client):
+        self.client = client
+
+    @pytest.mark.django_db
     def test_csp_default_src_restricts_to_self(self) -> None:
         """CSP header should be present and restrict default-src to 'self'."""
         response = self.client.get("/api/posts/")
@@ -42,14 +46,10 @@ class TestDjango60CSP(TestCase):
 
     def test_no_inline_scripts_allowed(self) -> None:
         """script-src should not include 'unsafe-inline'."""
-        csp = {
-            "DIRECTIVES": {
-                "script-src": ["'self'"],
-            }
-        }
         # 'unsafe-inline' not present in script-src
-        assert "'unsafe-inline'" not in " ".join(csp["DIRECTIVES"].get("script-src", []))
+        assert "'unsafe-inline'" not in CSP_STRICT["DIRECTIVES"]["script-src"]
 
+    @pytest.mark.skipif(not DJANGO_60, reason="Django 6.0+ only")
     def test_csp_nonce_support(self) -> None:
         """Django 6.0 supports CSP nonces for inline scripts."""
         # Django 6.0: request.csp_nonce is available in templates
@@ -59,7 +59,6 @@ class TestDjango60CSP(TestCase):
         assert True  # Placeholder — implement when running on Django 6.0
 
 
-@pytest.mark.django_db
 class TestDjango60BackgroundTasks:
     """Django 6.0 native background tasks — django.tasks module.
 
@@ -67,7 +66,8 @@ class TestDjango60BackgroundTasks:
     In tests: they run synchronously (no broker needed).
     """
 
-    def test_enqueue_runs_in_test_mode(self, settings) -> None:
+    @pytest.mark.skip(reason="Django 6.0 django.tasks pending")
+    def test_django_tasks_enqueue(self) -> None:
         """django.tasks: enqueued tasks run synchronously in tests."""
         # Django 6.0 API (conceptual — requires Django 6.0):
         #
@@ -81,47 +81,29 @@ class TestDjango60BackgroundTasks:
         # cleanup_old_sessions.enqueue()
         # assert Session.objects.filter(expire_date__lt=now()).count() == 0
 
-        # For now, assert the pattern works with Celery ALWAYS_EAGER
-        settings.CELERY_TASK_ALWAYS_EAGER = True
-        settings.CELERY_TASK_EAGER_PROPAGATES = True
-
-        from django.core import mail
-
-        user = UserFactory()
-        post = PostFactory(author=user)
+    def test_enqueue_runs_in_test_mode(self) -> None:
+        """Until django.tasks lands, assert the enqueue call site."""
+        post_pk = 1
 
-        with patch("blog.tasks.send_post_published_email") as mock_send:
-            mock_send(post.pk)
-            mock_send.assert_called_once_with(post.pk)
+        with patch("blog.tasks.send_post_published_email", new_callable=Mock) as mock_send:
+            mock_send(post_pk)
+            mock_send.assert_called_once_with(post_pk)
 
-    def test_background_task_does_not_block_response(self) -> None:
-        """Background tasks must not delay the HTTP response."""
-        import time
+    @pytest.mark.django_db
+    def test_task_body_runs_without_a_worker(self, shared_user) -> None:
+        """The task body runs inline and its side effect lands in the outbox."""
+        post = Post.objects.create(author=shared_user, title="Live post", content="x")
 
-        user = UserFactory()
-        self.client = __import__("django.test", fromlist=["Client"]).Client()
-        self.client.force_login(user)
+        result = send_post_published_email.run(post.pk)
 
-        start = time.perf_counter()
-        # A view that enqueues a background task should respond quickly
-        # The task itself (e.g., sending email) runs after response is sent
-        elapsed = time.perf_counter() - start
+        assert result == {"sent": 1, "post_id": post.pk}
+        assert mail.outbox[0].to == [shared_user.email]
+        assert mail.outbox[0].subject == "Your post is live: Live post"
 
-        # Response should come back in < 500ms (not waiting for task)
-        assert elapsed < 0.5
 
-    TestDjango60BackgroundTasks.test_background_task_does_not_block_response.__doc__ = (
-        "Background tasks must not delay the HTTP response."
-    )
-
-
-class TestDjango60AsyncTestClient(TestCase):
-    """Django 6.0: AsyncClient improvements for async views."""
-
-    async def test_async_view_with_async_client(self) -> None:
-        """Django 6.0 AsyncClient works natively with async views."""
-        from django.test import AsyncClient
-
-        client = AsyncClient()
-        response = await client.get("/api/posts/")
-        assert response.status_code in (200, 401, 403)
+@pytest.mark.skipif(not DJANGO_60, reason="Django 6.0+ only")
+@pytest.mark.django_db
+async def test_async_view_with_async_client() -> None:
+    """Django 6.0: AsyncClient works natively with async views."""
+    response = await AsyncClient().get("/api/posts/")
+    assert response.status_code in (200, 401, 403)